@@ -1,13 +1,17 @@
 import os
-import json
+import re
 import time
+import atexit
 import sqlite3
+import threading
 import logging
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import schedule
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(
@@ -31,37 +35,83 @@ class AmazonJobsScraper:
         
         # Amazon Jobs API configuration
         self.base_api_url = "https://www.amazon.jobs/en/search.json"
-        self.search_params = {
-            'base_query': 'SDE 1',
-            'sort': 'recent',
-            'radius': '24km',
-            'facets[]': 'normalized_country_code',
-            'facets[]': 'normalized_state_name',
-            'facets[]': 'normalized_city_name',
-            'facets[]': 'location',
-            'facets[]': 'business_category',
-            'facets[]': 'category',
-            'facets[]': 'schedule_type_id',
-            'facets[]': 'employee_class',
-            'facets[]': 'normalized_location',
-            'facets[]': 'job_family_name',
-            'offset': 0
-        }
+        # List of tuples rather than a dict: 'facets[]' repeats, and duplicate
+        # dict keys would silently collapse to the last one
+        self.search_params = [
+            ('base_query', 'SDE 1'),
+            ('sort', 'recent'),
+            ('radius', '24km'),
+            ('facets[]', 'normalized_country_code'),
+            ('facets[]', 'normalized_state_name'),
+            ('facets[]', 'normalized_city_name'),
+            ('facets[]', 'location'),
+            ('facets[]', 'business_category'),
+            ('facets[]', 'category'),
+            ('facets[]', 'schedule_type_id'),
+            ('facets[]', 'employee_class'),
+            ('facets[]', 'normalized_location'),
+            ('facets[]', 'job_family_name'),
+            ('result_limit', '100'),
+        ]
         
-        # Database setup
+        # Database setup: one long-lived connection instead of opening per call
         self.db_path = 'jobs.db'
         self.init_database()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        # These are per-connection settings, so they must be applied to the
+        # connection that does the work, not the setup one in init_database
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-20000")
+        self._conn.execute("PRAGMA mmap_size=134217728")
+        atexit.register(self._conn.close)
         
+        # Single compiled pattern for SDE-1 title matching; re.IGNORECASE
+        # avoids lowering each title and one C-level scan replaces several
+        # Python substring checks per job
+        self._sde1_re = re.compile(
+            r'\bsde\s?[1i]\b|\bsoftware\s+development\s+engineer[\s-]+i\b',
+            re.IGNORECASE
+        )
+
         # Request session with retry logic
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         })
 
+        # Persistent session for Telegram so keep-alive reuses one TLS connection
+        self.telegram_api_url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
+        self.telegram_session = requests.Session()
+        self.telegram_session.mount('https://', HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        ))
+
+        # Bounded pool so notification sends overlap network latency; the
+        # monotonic gate in _throttle_telegram keeps us under Telegram's
+        # 30 msg/sec global limit
+        self._tg_pool = ThreadPoolExecutor(max_workers=4)
+        self._tg_rate_lock = threading.Lock()
+        self._tg_next_send = 0.0
+
     def init_database(self):
         """Initialize SQLite database to store job IDs"""
         try:
             with sqlite3.connect(self.db_path) as conn:
+                # Unlike the other PRAGMAs, journal_mode is stored in the
+                # database file itself, so switching to WAL once here covers
+                # every later connection
+                conn.execute("PRAGMA journal_mode=WAL")
                 conn.execute('''
                     CREATE TABLE IF NOT EXISTS seen_jobs (
                         job_id TEXT PRIMARY KEY,
@@ -71,38 +121,51 @@ class AmazonJobsScraper:
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
+                # cleanup_old_jobs deletes by created_at; without this index
+                # the DELETE scans the whole table
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_seen_created_at ON seen_jobs(created_at)"
+                )
                 conn.commit()
             logger.info("Database initialized successfully")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
             raise
 
-    @contextmanager
-    def get_db_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            yield conn
-        finally:
-            conn.close()
-
     def is_job_seen(self, job_id: str) -> bool:
         """Check if job has been seen before"""
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1 FROM seen_jobs WHERE job_id = ?", (job_id,))
+            with self._db_lock:
+                cursor = self._conn.execute(
+                    "SELECT 1 FROM seen_jobs WHERE job_id = ?", (job_id,)
+                )
                 return cursor.fetchone() is not None
         except Exception as e:
             logger.error(f"Error checking if job seen: {e}")
             return False
 
+    def get_seen_job_ids(self, job_ids: List[str]) -> set:
+        """Return the subset of job_ids already present in the database"""
+        if not job_ids:
+            return set()
+        try:
+            with self._db_lock:
+                placeholders = ','.join('?' * len(job_ids))
+                cursor = self._conn.execute(
+                    f"SELECT job_id FROM seen_jobs WHERE job_id IN ({placeholders})",
+                    job_ids
+                )
+                return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error checking seen jobs: {e}")
+            return set()
+
     def mark_job_as_seen(self, job_data: Dict):
         """Mark job as seen in database"""
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+            # The connection's own context manager commits on exit
+            with self._db_lock, self._conn:
+                self._conn.execute('''
                     INSERT OR REPLACE INTO seen_jobs (job_id, title, location, posted_date)
                     VALUES (?, ?, ?, ?)
                 ''', (
@@ -111,109 +174,140 @@ class AmazonJobsScraper:
                     job_data['location'],
                     job_data['posted_date']
                 ))
-                conn.commit()
         except Exception as e:
             logger.error(f"Error marking job as seen: {e}")
 
+    def mark_jobs_as_seen(self, jobs: List[Dict]):
+        """Mark a batch of jobs as seen in one transaction (single fsync)"""
+        if not jobs:
+            return
+        try:
+            with self._db_lock, self._conn:
+                self._conn.executemany('''
+                    INSERT OR REPLACE INTO seen_jobs (job_id, title, location, posted_date)
+                    VALUES (?, ?, ?, ?)
+                ''', [
+                    (job['job_id'], job['title'], job['location'], job['posted_date'])
+                    for job in jobs
+                ])
+        except Exception as e:
+            logger.error(f"Error marking jobs as seen: {e}")
+
     def cleanup_old_jobs(self, days_old: int = 30):
         """Remove old job records from database"""
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
+            with self._db_lock, self._conn:
                 cutoff_date = datetime.now() - timedelta(days=days_old)
-                cursor.execute(
+                cursor = self._conn.execute(
                     "DELETE FROM seen_jobs WHERE created_at < ?",
                     (cutoff_date.isoformat(),)
                 )
                 deleted_count = cursor.rowcount
-                conn.commit()
-                if deleted_count > 0:
-                    logger.info(f"Cleaned up {deleted_count} old job records")
+            if deleted_count > 0:
+                logger.info(f"Cleaned up {deleted_count} old job records")
         except Exception as e:
             logger.error(f"Error cleaning up old jobs: {e}")
 
-    def fetch_jobs(self) -> List[Dict]:
-        """Fetch jobs from Amazon Jobs API"""
+    def fetch_jobs(self, cutoff: datetime, cutoff_iso: str, max_offset: int = 1000) -> List[Dict]:
+        """Fetch jobs from Amazon Jobs API, paginating until results go stale"""
+        jobs = []
         try:
             logger.info("Fetching jobs from Amazon API...")
-            response = self.session.get(
-                self.base_api_url,
-                params=self.search_params,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs = data.get('jobs', [])
+            for offset in range(0, max_offset, 100):
+                params = self.search_params + [('offset', str(offset))]
+                response = self.session.get(
+                    self.base_api_url,
+                    params=params,
+                    timeout=30
+                )
+                response.raise_for_status()
+
+                # Don't feed error HTML pages to the JSON parser
+                if 'json' not in response.headers.get('content-type', ''):
+                    logger.error(
+                        f"Unexpected content type from API: "
+                        f"{response.headers.get('content-type', 'unknown')}"
+                    )
+                    break
+
+                data = orjson.loads(response.content)
+                page = data.get('jobs', [])
+                if not page:
+                    break
+                jobs.extend(page)
+
+                # Results are sorted by recency, so once a whole page is older
+                # than 24 hours no later page can contain a recent job
+                if not any(self.is_recent_job(job.get('posted_date', ''), cutoff, cutoff_iso) for job in page):
+                    break
+
             logger.info(f"Fetched {len(jobs)} jobs from API")
             return jobs
-            
+
         except requests.exceptions.RequestException as e:
             logger.error(f"Network error fetching jobs: {e}")
-            return []
-        except json.JSONDecodeError as e:
+            return jobs
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON decode error: {e}")
-            return []
+            return jobs
         except Exception as e:
             logger.error(f"Unexpected error fetching jobs: {e}")
-            return []
+            return jobs
 
-    def is_recent_job(self, posted_date_str: str) -> bool:
-        """Check if job was posted in the last 24 hours"""
+    def is_recent_job(self, posted_date_str: str, cutoff: datetime, cutoff_iso: str) -> bool:
+        """Check if job was posted after the cutoff (computed once per cycle)"""
         try:
-            # Amazon uses various date formats, try to parse
+            # Amazon uses various date formats; dispatch on the shape of the
+            # string so each one is parsed with a single attempt instead of
+            # trying every format and catching ValueError until one fits
             posted_date = None
-            
-            # Try different date formats
-            date_formats = [
-                '%B %d, %Y',  # December 8, 2023
-                '%b %d, %Y',   # Dec 8, 2023
-                '%Y-%m-%d',    # 2023-12-08
-                '%m/%d/%Y',    # 12/08/2023
-            ]
-            
-            for date_format in date_formats:
-                try:
-                    posted_date = datetime.strptime(posted_date_str, date_format)
-                    break
-                except ValueError:
-                    continue
-            
+            s = posted_date_str.strip()
+
+            # ISO-8601 compares correctly as a string, so the common
+            # 2023-12-08 shape needs no parsing at all
+            if len(s) == 10 and s[4] == '-':
+                return s >= cutoff_iso
+
+            try:
+                if '/' in s:
+                    posted_date = datetime.strptime(s, '%m/%d/%Y')  # 12/08/2023
+                elif ',' in s:
+                    if len(s.split()[0]) <= 3:
+                        posted_date = datetime.strptime(s, '%b %d, %Y')  # Dec 8, 2023
+                    else:
+                        posted_date = datetime.strptime(s, '%B %d, %Y')  # December 8, 2023
+            except ValueError:
+                posted_date = None
+
             if not posted_date:
                 logger.warning(f"Could not parse date: {posted_date_str}")
                 return False
-            
-            # Check if posted within last 24 hours
-            now = datetime.now()
-            time_diff = now - posted_date
-            return time_diff.total_seconds() <= 24 * 60 * 60
-            
+
+            # Posted dates carry no time of day, so compare at date
+            # granularity to match the ISO string fast path
+            return posted_date.date() >= cutoff.date()
+
         except Exception as e:
             logger.error(f"Error checking job recency: {e}")
             return False
 
-    def filter_sde1_jobs(self, jobs: List[Dict]) -> List[Dict]:
-        """Filter jobs for SDE-1 roles posted in last 24 hours"""
-        filtered_jobs = []
-        
+    def filter_sde1_jobs(self, jobs: List[Dict], cutoff: datetime, cutoff_iso: str) -> List[Dict]:
+        """Filter jobs for SDE-1 roles posted after the cutoff"""
+        candidates = []
+
         for job in jobs:
             try:
-                title = job.get('title', '').lower()
                 job_id = job.get('id_icims', '')
-                
+
                 # Check if it's an SDE-1 role
-                if not any(keyword in title for keyword in ['sde 1', 'software development engineer i','software development Engineer-i', 'sde i']):
+                if not self._sde1_re.search(job.get('title', '')):
                     continue
-                
+
                 # Check if job was posted recently
                 posted_date = job.get('posted_date', '')
-                if not self.is_recent_job(posted_date):
-                    continue
-                
-                # Check if we've seen this job before
-                if self.is_job_seen(job_id):
+                if not self.is_recent_job(posted_date, cutoff, cutoff_iso):
                     continue
-                
+
                 # Extract relevant data
                 job_data = {
                     'job_id': job_id,
@@ -222,14 +316,17 @@ class AmazonJobsScraper:
                     'posted_date': posted_date,
                     'url': f"https://www.amazon.jobs/en/jobs/{job_id}/apply"
                 }
-                
-                filtered_jobs.append(job_data)
-                
+
+                candidates.append(job_data)
+
             except Exception as e:
                 logger.error(f"Error processing job: {e}")
                 continue
-        
-        return filtered_jobs
+
+        # Check all candidates against the database in one query instead of
+        # one is_job_seen round-trip per job
+        seen = self.get_seen_job_ids([job['job_id'] for job in candidates])
+        return [job for job in candidates if job['job_id'] not in seen]
 
     def send_telegram_notification(self, job_data: Dict) -> bool:
         """Send notification via Telegram"""
@@ -243,16 +340,15 @@ Apply: {job_data['url']}
 
 #AmazonJobs #SDE1 #SoftwareEngineer"""
 
-            telegram_api_url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
-            
+            self._throttle_telegram()
             payload = {
                 'chat_id': self.telegram_chat_id,
                 'text': message,
                 'parse_mode': 'HTML',
                 'disable_web_page_preview': False
             }
-            
-            response = requests.post(telegram_api_url, json=payload, timeout=30)
+
+            response = self.telegram_session.post(self.telegram_api_url, json=payload, timeout=30)
             response.raise_for_status()
             
             logger.info(f"Notification sent for job: {job_data['title']}")
@@ -262,19 +358,96 @@ Apply: {job_data['url']}
             logger.error(f"Error sending Telegram notification: {e}")
             return False
 
+    def _throttle_telegram(self):
+        """Gate sends so concurrent workers respect Telegram's 30 msg/sec limit"""
+        with self._tg_rate_lock:
+            now = time.monotonic()
+            wait = self._tg_next_send - now
+            self._tg_next_send = max(now, self._tg_next_send) + 1 / 30
+        if wait > 0:
+            time.sleep(wait)
+
+    def _send_telegram_chunk(self, message: str):
+        """Send one digest chunk; runs on the notification pool"""
+        self._throttle_telegram()
+        payload = {
+            'chat_id': self.telegram_chat_id,
+            'text': message,
+            'parse_mode': 'HTML',
+            'disable_web_page_preview': True
+        }
+        response = self.telegram_session.post(self.telegram_api_url, json=payload, timeout=30)
+        response.raise_for_status()
+
+    def send_telegram_batch(self, jobs: List[Dict]) -> List[Dict]:
+        """Send one digest message for up to ~10 jobs instead of one message per job.
+
+        Job blocks are joined until a chunk approaches Telegram's 4096-char
+        message limit, then flushed. Chunks are dispatched concurrently on
+        the notification pool so total time is dominated by one round-trip,
+        not one per chunk. Returns the jobs that were delivered.
+        """
+        chunks = []
+        chunk_jobs = []
+        chunk_blocks = []
+        chunk_length = 0
+
+        def flush():
+            nonlocal chunk_jobs, chunk_blocks, chunk_length
+            if not chunk_blocks:
+                return
+            chunks.append(("\n\n---\n\n".join(chunk_blocks), chunk_jobs))
+            chunk_jobs = []
+            chunk_blocks = []
+            chunk_length = 0
+
+        for job_data in jobs:
+            block = f"""🚨 New Amazon SDE-1 Role!
+
+Title: {job_data['title']}
+Location: {job_data['location']}
+Posted: {job_data['posted_date']}
+Apply: {job_data['url']}"""
+
+            if chunk_blocks and chunk_length + len(block) >= 3500:
+                flush()
+            chunk_jobs.append(job_data)
+            chunk_blocks.append(block)
+            chunk_length += len(block)
+
+        flush()
+
+        sent_jobs = []
+        futures = {
+            self._tg_pool.submit(self._send_telegram_chunk, message): batch_jobs
+            for message, batch_jobs in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+                sent_jobs.extend(futures[future])
+                logger.info(f"Notification batch sent for {len(futures[future])} jobs")
+            except Exception as e:
+                logger.error(f"Error sending Telegram batch: {e}")
+        return sent_jobs
+
     def run_scraping_cycle(self):
         """Run one complete scraping cycle"""
         try:
             logger.info("Starting scraping cycle...")
-            
+
+            # Compute the recency cutoff once for the whole cycle
+            cutoff = datetime.now() - timedelta(hours=24)
+            cutoff_iso = cutoff.strftime('%Y-%m-%d')
+
             # Fetch jobs from API
-            jobs = self.fetch_jobs()
+            jobs = self.fetch_jobs(cutoff, cutoff_iso)
             if not jobs:
                 logger.warning("No jobs fetched from API")
                 return
-            
+
             # Filter for SDE-1 jobs
-            new_jobs = self.filter_sde1_jobs(jobs)
+            new_jobs = self.filter_sde1_jobs(jobs, cutoff, cutoff_iso)
             
             if not new_jobs:
                 logger.info("No new SDE-1 jobs found")
@@ -282,11 +455,9 @@ Apply: {job_data['url']}
             
             logger.info(f"Found {len(new_jobs)} new SDE-1 jobs")
             
-            # Send notifications and mark jobs as seen
-            for job in new_jobs:
-                if self.send_telegram_notification(job):
-                    self.mark_job_as_seen(job)
-                    time.sleep(1)  # Rate limiting for Telegram
+            # Send notifications in batches and mark delivered jobs as seen
+            sent_jobs = self.send_telegram_batch(new_jobs)
+            self.mark_jobs_as_seen(sent_jobs)
             
             # Cleanup old job records weekly
             if datetime.now().hour == 0 and datetime.now().minute < 15:
@@ -302,13 +473,12 @@ Apply: {job_data['url']}
         try:
             test_message = "🧪 Amazon Jobs Scraper is now active!\n\nYou'll receive notifications for new SDE-1 roles."
             
-            telegram_api_url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
             payload = {
                 'chat_id': self.telegram_chat_id,
                 'text': test_message
             }
-            
-            response = requests.post(telegram_api_url, json=payload, timeout=30)
+
+            response = self.telegram_session.post(self.telegram_api_url, json=payload, timeout=30)
             response.raise_for_status()
             
             logger.info("Test message sent successfully")
@@ -330,19 +500,16 @@ def main():
             logger.error("Setup test failed - check configuration")
             return
         
-        # Schedule the scraper to run every 15 minutes
-        schedule.every(15).minutes.do(scraper.run_scraping_cycle)
-        
-        # Run initial scrape
-        scraper.run_scraping_cycle()
-        
         logger.info("Scheduler started - running every 15 minutes")
-        
-        # Keep the script running
+
+        # Run every 15 minutes, sleeping the whole interval in one go
+        # instead of waking each minute to poll a scheduler
+        interval = 15 * 60
         while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-            
+            next_run = time.monotonic() + interval
+            scraper.run_scraping_cycle()
+            time.sleep(max(0, next_run - time.monotonic()))
+
     except KeyboardInterrupt:
         logger.info("Scraper stopped by user")
     except Exception as e: